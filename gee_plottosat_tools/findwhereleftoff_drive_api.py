@@ -29,9 +29,18 @@ Notes:
 
 
 
+import json
 import re
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+import httplib2
+from google_auth_httplib2 import AuthorizedHttp
 from google_auth_oauthlib.flow import InstalledAppFlow
 from googleapiclient.discovery import build
+from googleapiclient.http import HttpRequest
 
 
 ##===================##
@@ -52,6 +61,26 @@ DEFAULT_PARENT_FOLDER_NAME = None  # e.g. "MyFolder" to scan a specific Drive fo
 DEFAULT_SEARCH_IN_ROOT = True
 DEFAULT_CREDENTIALS_FILE = "drive_credentials.json"
 
+# where to remember results between runs, so unchanged folders
+# don't need re-listing next time
+DEFAULT_CACHE_FILE = "plot_export_cache.json"
+
+# on-disk cache for httplib2; lets the library answer repeat requests
+# with conditional GETs instead of full downloads
+HTTP_CACHE_DIR = ".drive_httpcache"
+HTTP_TIMEOUT_SECONDS = 30
+
+# how many Drive requests to keep in flight at once
+MAX_PARALLEL_REQUESTS = 8
+
+# One regex that both recognizes a chunk export CSV and captures its end
+# index, so each filename is inspected in a single pass.
+_CSV_CHUNK_RE = re.compile(r"_(\d+)_S\d+_mean\.csv\Z", re.IGNORECASE)
+
+# above this many filenames, parsing in pandas/NumPy beats a Python loop
+VECTORIZE_THRESHOLD = 1024
+
+
 
 
 
@@ -68,7 +97,8 @@ class PlotExportChecker:
     search_in_root=DEFAULT_SEARCH_IN_ROOT,
     countries=DEFAULT_COUNTRIES,
     years=DEFAULT_YEARS,
-    total_plots=DEFAULT_TOTAL_PLOTS
+    total_plots=DEFAULT_TOTAL_PLOTS,
+    cache_file=DEFAULT_CACHE_FILE
     ):
         """
         Initialize the PlotExportChecker with configurable parameters.
@@ -79,11 +109,14 @@ class PlotExportChecker:
         self.countries = countries
         self.years = years
         self.total_plots = total_plots
+        self.cache_file = cache_file
 
         # internal initial state
         self.drive_service = None
         self.parent_folder_id = None
         self.country_year_folders = {}
+        self.folder_modified_times = {}
+        self.max_index_by_folder = {}
         self.unfinished_exports = {}
 
 
@@ -98,7 +131,25 @@ class PlotExportChecker:
         scopes = ['https://www.googleapis.com/auth/drive.metadata.readonly']
         flow = InstalledAppFlow.from_client_secrets_file(self.drive_credentials_file, scopes)
         credentials = flow.run_local_server(port=0)
-        self.drive_service = build('drive', 'v3', credentials=credentials)
+
+        # httplib2.Http() is not thread-safe, so hand every request its own
+        # fresh authorized connection. This lets us fire requests from a
+        # thread pool without them trampling each other. They all share the
+        # on-disk cache, so unchanged responses come back as cheap 304s.
+        def make_authorized_http():
+            return AuthorizedHttp(
+                credentials,
+                http=httplib2.Http(cache=HTTP_CACHE_DIR, timeout=HTTP_TIMEOUT_SECONDS)
+            )
+
+        def build_request(http, *args, **kwargs):
+            return HttpRequest(make_authorized_http(), *args, **kwargs)
+
+        self.drive_service = build(
+            'drive', 'v3',
+            requestBuilder=build_request,
+            http=make_authorized_http()
+        )
 
     def pick_parent_folder(self):
 
@@ -112,9 +163,9 @@ class PlotExportChecker:
             print("Searching in the ROOT of your Google Drive.")
         else:
             response = self.drive_service.files().list(
-                q=f"name='{self.parent_folder_name}' and mimeType='application/vnd.google-apps.folder'",
+                q=f"name='{self.parent_folder_name}' and mimeType='application/vnd.google-apps.folder' and trashed = false",
                 spaces='drive',
-                fields='files(id, name)'
+                fields='files(id)'
             ).execute()
             folders = response.get('files', [])
             if not folders:
@@ -122,6 +173,25 @@ class PlotExportChecker:
             self.parent_folder_id = folders[0]['id']
             print(f"Found folder '{self.parent_folder_name}' with ID {self.parent_folder_id}")
 
+    def _list_all(self, query, fields):
+
+        """
+        Run one files().list query and keep paging until Drive runs out
+        of results, yielding every file. Uses the maximum page size so
+        big folders need as few round-trips as possible.
+        """
+
+        request = self.drive_service.files().list(
+            q=query,
+            fields='nextPageToken, ' + fields,
+            pageSize=1000,
+            spaces='drive'
+        )
+        while request is not None:
+            response = request.execute()
+            yield from response.get('files', [])
+            request = self.drive_service.files().list_next(request, response)
+
     def list_country_year_folders(self):
 
         """
@@ -129,22 +199,143 @@ class PlotExportChecker:
         For example:
           Greenbelts_S2_Finland_2016
         """
+        folders = self._list_all(
+            f"'{self.parent_folder_id}' in parents and mimeType='application/vnd.google-apps.folder' and trashed = false",
+            'files(id, name, modifiedTime)'
+        )
+        for folder in folders:
+            self.country_year_folders[folder['name']] = folder['id']
+            self.folder_modified_times[folder['id']] = folder.get('modifiedTime')
+
+    def _load_cache(self):
+
+        """
+        Read the results of the previous run from the cache file.
+        Returns an empty dict if there is no usable cache yet.
+        """
+
+        try:
+            with open(self.cache_file) as f:
+                cache = json.load(f)
+            if isinstance(cache, dict):
+                return cache
+        except (OSError, ValueError):
+            pass
+        return {}
+
+    def _save_cache(self, cache):
+
+        """
+        Write the per-folder results back to the cache file so the
+        next run can skip folders that have not changed.
+        """
+
+        try:
+            with open(self.cache_file, 'w') as f:
+                json.dump(cache, f)
+        except OSError as error:
+            print(f"Warning: could not write cache file {self.cache_file}: {error}")
+
+    def collect_max_chunk_indices(self):
+
+        """
+        Work out the highest exported chunk index for every country/year
+        folder. Folders whose modifiedTime matches the local cache file
+        are not queried at all; the rest are probed concurrently, one
+        tiny request per folder.
+        """
+
+        # only query the folders we actually care about, not every
+        # subfolder that happens to live under the parent
+        target_names = {
+            f"Greenbelts_S2_{country}_{year}"
+            for country in self.countries
+            for year in self.years
+        }
+        folder_ids = [
+            folder_id for name, folder_id in self.country_year_folders.items()
+            if name in target_names
+        ]
+
+        # Skip folders Drive says are untouched since our previous run:
+        # the cache already knows their highest chunk index.
+        cache = self._load_cache()
+        folders_to_list = []
+        for folder_id in folder_ids:
+            cached = cache.get(folder_id)
+            modified_time = self.folder_modified_times.get(folder_id)
+            if cached and modified_time and cached[0] == modified_time:
+                self.max_index_by_folder[folder_id] = cached[1]
+            else:
+                folders_to_list.append(folder_id)
+
+        # probe the changed folders concurrently and remember the answers
+        with ThreadPoolExecutor(max_workers=MAX_PARALLEL_REQUESTS) as executor:
+            results = executor.map(self._max_index_for_folder, folders_to_list)
+            for folder_id, max_end_index in zip(folders_to_list, results):
+                self.max_index_by_folder[folder_id] = max_end_index
+                cache[folder_id] = [self.folder_modified_times.get(folder_id), max_end_index]
+
+        self._save_cache(cache)
+
+    def _max_index_for_folder(self, folder_id):
+
+        """
+        Find the highest chunk end index in one folder. The chunk numbers
+        in the export filenames are zero-padded, so sorting by name in
+        descending order puts the newest export first and we only need to
+        ask Drive for a single file. If that top name does not parse,
+        fall back to listing the whole folder.
+        """
+
+        query = (
+            f"'{folder_id}' in parents "
+            "and mimeType!='application/vnd.google-apps.folder' "
+            "and name contains '_mean.csv' and trashed = false"
+        )
         response = self.drive_service.files().list(
-            q=f"'{self.parent_folder_id}' in parents and mimeType='application/vnd.google-apps.folder'",
-            fields='files(id, name)'
+            q=query,
+            orderBy='name desc',
+            pageSize=1,
+            fields='files(name)',
+            spaces='drive'
         ).execute()
+        files = response.get('files', [])
+        if not files:
+            return -1
 
-        for folder in response.get('files', []):
-            self.country_year_folders[folder['name']] = folder['id']
+        top_index = self.extract_chunk_end_index(files[0]['name'])
+        if top_index >= 0:
+            return top_index
+
+        # the top name didn't look like a chunk export, so scan everything
+        names = [f['name'] for f in self._list_all(query, 'files(name)')]
+        return self._max_chunk_index(names)
 
     @staticmethod
-    def is_csv_file(filename):
+    def _max_chunk_index(names):
 
         """
-        Checks if a file looks like a CSV file by its name.
+        Highest chunk end index across a list of filenames. Big folders
+        take the pandas path, where the parsing runs in C over the whole
+        list at once instead of one interpreter iteration per name.
+        The regex itself filters out non-export files, so no separate
+        CSV check is needed.
         """
 
-        return filename.lower().endswith(".csv")
+        if len(names) > VECTORIZE_THRESHOLD:
+            ends = (
+                pd.Series(names)
+                .str.extract(_CSV_CHUNK_RE, expand=True)[0]
+                .dropna()
+                .astype('int64')
+            )
+            return int(ends.max()) if len(ends) else -1
+
+        return max(
+            (int(match.group(1)) for name in names if (match := _CSV_CHUNK_RE.search(name))),
+            default=-1
+        )
 
     @staticmethod
     def extract_chunk_end_index(filename):
@@ -152,14 +343,12 @@ class PlotExportChecker:
         """
         Given a filename with chunk markers, like
           feature_vectors_S2_0000000000_0000000500_S2_mean.csv
-        extract the second number (the chunk end).
+        extract the second number (the chunk end). One regex pass both
+        confirms the name is a chunk export and captures the index.
         """
 
-        match = re.search(r"_(\d+)_(\d+)_S\d+_mean\.csv$", filename)
-        if match:
-            return int(match.group(2))
-        else:
-            return -1
+        match = _CSV_CHUNK_RE.search(filename)
+        return int(match.group(1)) if match else -1
 
     def check_country_year_completion(self):
 
@@ -168,57 +357,55 @@ class PlotExportChecker:
         and collect any unfinished ranges.
         """
 
-        print("\n*****************************")
-        print("COMPLETION REPORT")
-        print("*****************************\n")
+        # build the whole report first and write it in one go, rather than
+        # paying a write syscall per print()
+        report = [
+            "\n*****************************",
+            "COMPLETION REPORT",
+            "*****************************\n",
+        ]
 
         for country in self.countries:
+            # these don't change per year, so bind them once per country
+            total_plots_for_country = self.total_plots[country]
+            folder_name_prefix = f"Greenbelts_S2_{country}_"
+
             for year in self.years:
-                folder_name = f"Greenbelts_S2_{country}_{year}"
-                folder_id = self.country_year_folders.get(folder_name)
-                total_plots_for_country = self.total_plots[country]
+                folder_id = self.country_year_folders.get(folder_name_prefix + str(year))
 
                 if folder_id is None:
-                    print(f"{country} {year}: folder missing, assuming 0 of {total_plots_for_country} done")
+                    report.append(f"{country} {year}: folder missing, assuming 0 of {total_plots_for_country} done")
                     self.unfinished_exports[(country, year)] = (0, total_plots_for_country)
                     continue
 
-                # list CSVs in the folder
-                response = self.drive_service.files().list(
-                    q=f"'{folder_id}' in parents and mimeType!='application/vnd.google-apps.folder'",
-                    fields="files(name)"
-                ).execute()
-                csv_files = [f['name'] for f in response.get('files', []) if self.is_csv_file(f['name'])]
-
-                # find highest chunk
-                if csv_files:
-                    max_end_index = max(
-                        self.extract_chunk_end_index(name)
-                        for name in csv_files
-                    )
-                else:
-                    max_end_index = -1
+                # highest chunk index, either freshly listed or from the cache
+                max_end_index = self.max_index_by_folder.get(folder_id, -1)
 
                 completed = max_end_index + 1
                 remaining = total_plots_for_country - completed
 
-                print(f"{country} {year}: {completed} of {total_plots_for_country} done "
-                      f"({remaining} left to do)")
+                report.append(f"{country} {year}: {completed} of {total_plots_for_country} done "
+                              f"({remaining} left to do)")
 
                 if completed < total_plots_for_country:
                     self.unfinished_exports[(country, year)] = (completed, total_plots_for_country)
 
+        sys.stdout.write("\n".join(report) + "\n")
+
     def print_export_ranges(self):
 
         """
         Show the export ranges in the correct dictionary syntax.
         """
 
-        print("\n*** AUTO-GENERATED EXPORT RANGES FOR UNFINISHED PLOT RANGES ONLY ***")
-        print("export_ranges = {")
+        lines = [
+            "\n*** AUTO-GENERATED EXPORT RANGES FOR UNFINISHED PLOT RANGES ONLY ***",
+            "export_ranges = {",
+        ]
         for (country, year), (start, end) in self.unfinished_exports.items():
-            print(f"    ('{country}', {year}): ({start}, {end}),")
-        print("}")
+            lines.append(f"    ('{country}', {year}): ({start}, {end}),")
+        lines.append("}")
+        sys.stdout.write("\n".join(lines) + "\n")
 
     def run(self):
 
@@ -229,6 +416,7 @@ class PlotExportChecker:
         self.authenticate_google_drive()
         self.pick_parent_folder()
         self.list_country_year_folders()
+        self.collect_max_chunk_indices()
         self.check_country_year_completion()
         self.print_export_ranges()
 
@@ -24,6 +24,7 @@ Notes:
 
 import os
 import re
+from concurrent.futures import ThreadPoolExecutor
 
 ##===================##
 ###~ CONFIGURATION ~###
@@ -45,60 +46,100 @@ TOTAL_PLOTS = {
     "Norway": 26,
 }
 
-# === HELPER FUNCTIONS ===
+# How many folders to scan at once; helps when the export folder lives
+# on a network/SMB share where each directory read pays a round-trip
+MAX_SCAN_WORKERS = 8
+
+# Matches export folder names like Greenbelts_S2_Finland_2016
+_FOLDER_RE = re.compile(r"^Greenbelts_S2_(\w+)_(\d{4})$")
 
-def get_country_folder_path(base_path, country, year):
-    return os.path.join(base_path, f"Greenbelts_S2_{country}_{year}")
+# One regex that both recognizes a chunk export CSV and captures its end
+# index, so each filename is inspected in a single pass.
+_CSV_CHUNK_RE = re.compile(r"_(\d+)_S\d+_mean\.csv\Z", re.IGNORECASE)
 
-def is_csv_file(filename):
-    return filename.lower().endswith(".csv")
+# === HELPER FUNCTIONS ===
 
-def extract_end_index(filename):
-    match = re.search(r"_(\d+)_(\d+)_S\d+_mean\.csv$", filename)
-    return int(match.group(2)) if match else -1
+def find_country_year_folders(base_path):
+    # One scandir over the base folder finds every country/year export
+    # folder at once, instead of probing years x countries paths.
+    folders = {}
+    with os.scandir(base_path) as entries:
+        for entry in entries:
+            if entry.is_dir():
+                match = _FOLDER_RE.match(entry.name)
+                if match:
+                    folders[(match.group(1), int(match.group(2)))] = entry.path
+    return folders
+
+def scan_folder(folder):
+    # Stream straight off the directory: filter, count and track the
+    # max end index in one scandir pass, without ever building a list
+    # of filenames. Memory stays O(1) however many CSVs are present.
+    # The single regex both spots chunk export CSVs and captures their
+    # end index, so each name is inspected once.
+    max_index, last_file, csv_count = -1, "N/A", 0
+    with os.scandir(folder) as entries:
+        for entry in entries:
+            match = _CSV_CHUNK_RE.search(entry.name)
+            if match and entry.is_file(follow_symlinks=False):
+                csv_count += 1
+                idx = int(match.group(1))
+                if idx > max_index:
+                    max_index, last_file = idx, entry.name
+    return max_index, last_file, csv_count
 
 # === MAIN SCRIPT ===
 
-def check_countries(year):
+def check_countries():
     grand_total = 0
     grand_done = 0
     export_ranges_lines = []
 
-    for country in COUNTRIES:
-        print(f"\n=== Checking {country} {year} ===")
-        folder = get_country_folder_path(BASE_FOLDER_PATH, country, year)
+    # scan the base folder once, then dispatch by parsed (country, year)
+    folders = find_country_year_folders(BASE_FOLDER_PATH)
+
+    # scan every present folder in parallel; each scan is independent and
+    # mostly waits on the filesystem, then report in the usual order
+    targets = [
+        (country, year)
+        for year in YEARS
+        for country in COUNTRIES
+        if (country, year) in folders
+    ]
+    with ThreadPoolExecutor(max_workers=MAX_SCAN_WORKERS) as executor:
+        scans = dict(zip(
+            targets,
+            executor.map(scan_folder, (folders[key] for key in targets))
+        ))
+
+    for year in YEARS:
+        for country in COUNTRIES:
+            print(f"\n=== Checking {country} {year} ===")
 
-        if not os.path.exists(folder):
-            print("Folder not found. Skipping.")
-            continue
+            if (country, year) not in scans:
+                print("Folder not found. Skipping.")
+                continue
 
-        all_files = os.listdir(folder)
-        csv_files = [
-            f for f in all_files
-            if os.path.isfile(os.path.join(folder, f)) and is_csv_file(f)
-        ]
+            max_index, last_file, csv_count = scans[(country, year)]
 
-        max_index = max((extract_end_index(f) for f in csv_files), default=-1)
-        total = TOTAL_PLOTS.get(country, 0)
-        done = max_index + 1 if max_index >= 0 else 0
-        remaining = max(total - done, 0)
+            total = TOTAL_PLOTS.get(country, 0)
+            done = max_index + 1 if max_index >= 0 else 0
+            remaining = max(total - done, 0)
 
-        grand_total += total
-        grand_done += done
+            grand_total += total
+            grand_done += done
 
-        if csv_files:
-            last_file = max(csv_files, key=extract_end_index)
-            print(f"Found {len(csv_files)} CSV file(s).")
-            print(f"Last exported file: {last_file}")
-        else:
-            print("No CSV files found.")
-            last_file = "N/A"
+            if csv_count:
+                print(f"Found {csv_count} CSV file(s).")
+                print(f"Last exported file: {last_file}")
+            else:
+                print("No CSV files found.")
 
-        print(f"Plots done: {done} / {total}")
-        print(f"Remaining: {remaining}")
+            print(f"Plots done: {done} / {total}")
+            print(f"Remaining: {remaining}")
 
-        # Collect lines for the suggested export_ranges
-        export_ranges_lines.append(f"    ('{country}', {year}): ({done}, {total}),")
+            # Collect lines for the suggested export_ranges
+            export_ranges_lines.append(f"    ('{country}', {year}): ({done}, {total}),")
 
     # === SUMMARY ===
     print("\n=== OVERALL PROGRESS ===")
@@ -112,6 +153,5 @@ def check_countries(year):
         print(line)
     print("}")
 
-# Run for each year
-for year in YEARS:
-    check_countries(year)
+if __name__ == "__main__":
+    check_countries()